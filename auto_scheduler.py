@@ -4,17 +4,33 @@ Automated Scheduler for GitHub Scanner
 Runs the scanner at specified intervals and updates the website
 """
 
-import schedule
+import sched
 import time
-import subprocess
+import io
 import os
+import atexit
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
 from datetime import datetime
 
+from enhanced_scanner import EnhancedGitHubScanner
+
 class ScannerScheduler:
-    def __init__(self, scanner_script="enhanced_scanner.py", interval_hours=6):
-        self.scanner_script = scanner_script
+    def __init__(self, interval_hours=6, scan_timeout=300):
         self.interval_hours = interval_hours
+        self.scan_timeout = scan_timeout
+        
+        # Run scans in-process so the HTTP session and ETag cache stay warm
+        self.scanner = EnhancedGitHubScanner()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._scan_future = None
+        
+        # Sleeps straight through to the next scan instead of polling
+        self._scheduler = sched.scheduler(time.monotonic, time.sleep)
         self.log_file = "scanner_log.txt"
+        
+        # Keep one buffered handle open instead of reopening per line
+        self._log_fh = open(self.log_file, 'a', encoding='utf-8', buffering=8192)
+        atexit.register(self._log_fh.close)
     
     def log(self, message):
         """Log message to file and console"""
@@ -23,37 +39,40 @@ class ScannerScheduler:
         
         print(log_message)
         
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(log_message + "\n")
+        self._log_fh.write(log_message + "\n")
     
     def run_scanner(self):
         """Execute the scanner script"""
         self.log("=" * 70)
-        self.log("🚀 Starting scheduled GitHub scan...")
         
-        try:
-            # Run the scanner
-            result = subprocess.run(
-                ["python3", self.scanner_script],
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
-            )
+        # A timed-out scan can't be killed, so never queue a second one behind it
+        if self._scan_future is not None and not self._scan_future.done():
+            self.log("⏳ Previous scan still running, skipped")
+        else:
+            self.log("🚀 Starting scheduled GitHub scan...")
             
-            if result.returncode == 0:
+            # Each scan writes its console output to its own buffer for the log
+            output = io.StringIO()
+            self._scan_future = self._executor.submit(self.scanner.run_full_scan, output=output)
+            try:
+                self._scan_future.result(timeout=self.scan_timeout)
+                
                 self.log("✅ Scanner completed successfully")
-                self.log(f"Output: {result.stdout[:500]}")  # Log first 500 chars
-            else:
-                self.log(f"❌ Scanner failed with code {result.returncode}")
-                self.log(f"Error: {result.stderr}")
-        
-        except subprocess.TimeoutExpired:
-            self.log("⏱️  Scanner timed out after 5 minutes")
-        except Exception as e:
-            self.log(f"💥 Error running scanner: {e}")
+                self.log(f"Output: {output.getvalue()[:500]}")  # Log first 500 chars
+            
+            except TimeoutError:
+                self.log(f"⏱️  Scanner still running after {self.scan_timeout // 60} minutes, no longer waiting")
+            except Exception as e:
+                self.log(f"💥 Error running scanner: {e}")
         
         self.log(f"⏰ Next scan in {self.interval_hours} hours")
         self.log("=" * 70 + "\n")
+        self._log_fh.flush()
+    
+    def _scheduled_scan(self):
+        """Run a scan and queue the next one"""
+        self.run_scanner()
+        self._scheduler.enter(self.interval_hours * 3600, 1, self._scheduled_scan)
     
     def start(self):
         """Start the scheduler"""
@@ -62,7 +81,7 @@ class ScannerScheduler:
         print("=" * 70)
         print(f"📅 Scan Interval: Every {self.interval_hours} hours")
         print(f"📝 Log File: {self.log_file}")
-        print(f"🔧 Scanner Script: {self.scanner_script}")
+        print(f"🔧 Scanner: {type(self.scanner).__name__} (in-process)")
         print("=" * 70)
         print()
         
@@ -71,18 +90,20 @@ class ScannerScheduler:
         self.run_scanner()
         
         # Schedule regular scans
-        schedule.every(self.interval_hours).hours.do(self.run_scanner)
+        self._scheduler.enter(self.interval_hours * 3600, 1, self._scheduled_scan)
         
         self.log(f"⏰ Scheduler started - will run every {self.interval_hours} hours")
         self.log("Press Ctrl+C to stop")
         
-        # Keep running
+        # Don't leave these lines buffered through the long sleep below
+        self._log_fh.flush()
+        
+        # Sleep until each scan is due
         try:
-            while True:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
+            self._scheduler.run()
         except KeyboardInterrupt:
             self.log("🛑 Scheduler stopped by user")
+            self._log_fh.flush()
             print("\nScheduler stopped.")
 
 
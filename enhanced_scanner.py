@@ -5,12 +5,156 @@ Monitors repositories, tracks freshness, and auto-updates the HTML tracker
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from jinja2 import Environment
+import functools
 import json
+import sys
+import tempfile
 import time
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Optional, Tuple
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import ijson  # Optional: stream-parse large search responses
+except ImportError:
+    ijson = None
+
+try:
+    import orjson  # Optional: faster JSON encode/decode
+except ImportError:
+    orjson = None
+
+# Matches either the GitHub repositories section (groups 1-3), between
+# <!-- GitHub Repositories --> and <!-- Archive.org Mirrors -->, or the
+# "Last Updated: ... |" timestamp, so the HTML is rewritten in one pass
+_HTML_UPDATE_RE = re.compile(
+    r'(<!-- GitHub Repositories -->.*?<div class="source-category">.*?<h3>📦 GitHub Repositories</h3>.*?<p class="category-description">.*?</p>)(.*?)(<!-- Archive\.org Mirrors -->)'
+    r'|(?-s:Last Updated: .*?\|)',
+    re.DOTALL
+)
+
+# Sentinels bracketing the generated repo cards in the HTML tracker
+_CARDS_START = b"<!--REPO_CARDS_START-->"
+_CARDS_END = b"<!--REPO_CARDS_END-->"
+_TIMESTAMP_RE = re.compile(rb'Last Updated: [^\n]*?\|')
+
+# Repo card markup, compiled once; autoescape keeps repo descriptions from injecting HTML
+_CARD_TEMPLATE = Environment(autoescape=True, keep_trailing_newline=True).from_string("""
+                    <div class="source-card github-repo {{ color }}">
+                        <div class="source-header">
+                            <h4>📦 {{ repo['name'] }}</h4>
+                            <div class="source-badges">
+                                {% if is_new %}<span class='new-badge'>🆕 NEW</span>{% endif %}
+                                <span class="freshness-badge {{ color }}">{{ badge }}</span>
+                                <span class="source-status active">✅ Active</span>
+                            </div>
+                        </div>
+                        <p class="source-description">{{ repo.get('description', 'No description') }}</p>
+                        <div class="source-meta">
+                            <span>⭐ {{ repo.get('stars', 0) }} stars</span>
+                            <span>📦 {{ repo.get('size_kb', 0) }} KB</span>
+                            {% if repo.get('language') %}<span>💻 {{ repo['language'] }}</span>{% endif %}
+                        </div>
+                        <div class="source-links">
+                            <a href="{{ repo['url'] }}" target="_blank" class="source-link">GitHub Repo →</a>
+                            {% if 'website' in repo %}<a href="{{ repo['website'] }}" target="_blank" class="source-link secondary">Website →</a>{% endif %}
+                        </div>
+                    </div>
+""")
+
+# fromisoformat only accepts a trailing 'Z' from Python 3.11 on
+_ISO_Z_SUPPORTED = sys.version_info >= (3, 11)
+
+_GITHUB_PREFIX = "https://github.com/"
+_REPO_API_URL = "https://api.github.com/repos/{owner}/{repo}"
+_BAD_URL_STATUS = {"status": "error", "error": "bad url"}
+
+
+def _parse_repo_url(repo_url: str):
+    """Split a GitHub repo URL into (owner, repo), or None if it is malformed"""
+    owner, _, rest = repo_url.removeprefix(_GITHUB_PREFIX).partition("/")
+    repo = rest.partition("/")[0]
+    if not owner or not repo:
+        return None
+    return owner, repo
+
+
+def _json_loads(content: bytes):
+    """Decode a JSON response body, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _json_dumps_indented(data) -> bytes:
+    """Encode data as indented UTF-8 JSON, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _atomic_write(path: str, *chunks: bytes):
+    """Write chunks to a temp file and rename it over path, so readers never see a partial file"""
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp = tempfile.NamedTemporaryFile(
+        dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp', delete=False
+    )
+    try:
+        with tmp:
+            for chunk in chunks:
+                tmp.write(chunk)
+        
+        # NamedTemporaryFile is created 0600; keep the published file readable
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except OSError:
+            mode = 0o644
+        os.chmod(tmp.name, mode)
+        os.replace(tmp.name, path)
+    except BaseException:
+        # Don't leave a stray temp file behind to be deployed with the site
+        os.unlink(tmp.name)
+        raise
+
+
+@functools.lru_cache(maxsize=512)
+def _badge_for_days(days: int) -> Tuple[str, str, str]:
+    """Return (freshness, badge, color) for a repo last updated `days` ago"""
+    if days == 0:
+        freshness = "today"
+        badge = "🔥 Today"
+        color = "fresh-today"
+    elif days == 1:
+        freshness = "yesterday"
+        badge = "🔥 Yesterday"
+        color = "fresh-today"
+    elif days <= 7:
+        freshness = f"{days} days ago"
+        badge = f"✅ {days}d ago"
+        color = "fresh-week"
+    elif days <= 30:
+        freshness = f"{days} days ago"
+        badge = f"📅 {days}d ago"
+        color = "fresh-month"
+    elif days <= 90:
+        months = days // 30
+        freshness = f"{months} month{'s' if months > 1 else ''} ago"
+        badge = f"📅 {months}mo ago"
+        color = "fresh-quarter"
+    else:
+        months = days // 30
+        freshness = f"{months} months ago"
+        badge = f"⚠️ {months}mo ago"
+        color = "fresh-old"
+    
+    return freshness, badge, color
+
 
 class EnhancedGitHubScanner:
     def __init__(self):
@@ -63,19 +207,115 @@ class EnhancedGitHubScanner:
         self.html_file = "epstein-files-tracker-v2.html"
         self.scan_results_file = "github_scan_results.json"
         self.new_repos_file = "new_repos_found.json"
+        self.known_repos_file = "known_repos.json"
+        self.etag_cache_file = ".etag_cache.json"
+        self.max_workers = 8
+        
+        # Stream for scan progress output; None means the current sys.stdout
+        self._out = None
+        
+        # Repos discovered by earlier scans are persisted between runs
+        # Only discoveries are saved; the hardcoded defaults above always come from code
+        self._default_repo_urls = {r['url'] for r in self.known_repos}
+        self.known_repos = self._load_known_repos(self.known_repos)
+        
+        # api_url -> {"etag": ..., "status": ...} for conditional requests
+        self._etag_cache = self._load_etag_cache()
+        
+        # Shared session so keep-alive connections are reused across calls
+        self._session = self._build_session()
+
+    def _print(self, *args, **kwargs):
+        """Print scan progress to this scan's output stream"""
+        print(*args, file=self._out or sys.stdout, **kwargs)
+
+    def _build_session(self) -> requests.Session:
+        """Create a pooled, retrying HTTP session for the GitHub API"""
+        session = requests.Session()
+        
+        # Retry-After is left to the capped _rate_limit_wait, so the adapter never
+        # sleeps for a server-chosen delay; a persistent 429 is handed back to it
+        retry = Retry(
+            total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504],
+            respect_retry_after_header=False, raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+        session.mount("https://", adapter)
+        
+        session.headers.update({
+            "Accept": "application/vnd.github+json",
+            "Accept-Encoding": "gzip"
+        })
+        
+        # Authenticated requests get 5000/hr instead of 60/hr
+        token = os.environ.get("GITHUB_TOKEN")
+        if token:
+            session.headers["Authorization"] = f"Bearer {token}"
+        
+        return session
+
+    def _load_known_repos(self, defaults: List[Dict]) -> List[Dict]:
+        """Return the defaults followed by any saved repos discovered in earlier scans"""
+        try:
+            with open(self.known_repos_file, 'r') as f:
+                saved_repos = json.load(f)
+        except (OSError, ValueError):
+            return defaults
+        
+        if not isinstance(saved_repos, list):
+            return defaults
+        
+        # Defaults win over saved copies, so edits to them in code take effect
+        return defaults + [
+            r for r in saved_repos
+            if self._is_valid_saved_repo(r) and r['url'] not in self._default_repo_urls
+        ]
+
+    @staticmethod
+    def _is_valid_saved_repo(repo) -> bool:
+        """Check a saved entry has the fields the scanner relies on"""
+        return isinstance(repo, dict) and isinstance(repo.get('url'), str) and isinstance(repo.get('name'), str)
+
+    def save_known_repos(self):
+        """Persist the discovered (non-default) repos to disk"""
+        discovered = [r for r in self.known_repos if r['url'] not in self._default_repo_urls]
+        _atomic_write(self.known_repos_file, _json_dumps_indented(discovered))
+
+    def _load_etag_cache(self) -> Dict:
+        """Load cached ETags and payloads from disk"""
+        try:
+            with open(self.etag_cache_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_etag_cache(self):
+        """Persist cached ETags and payloads to disk"""
+        _atomic_write(self.etag_cache_file, json.dumps(self._etag_cache).encode('utf-8'))
 
     def check_repo_status(self, repo_url: str) -> Dict:
         """Check if a GitHub repository is still accessible"""
         try:
-            parts = repo_url.replace("https://github.com/", "").split("/")
-            owner, repo = parts[0], parts[1]
+            parsed = _parse_repo_url(repo_url)
+            if parsed is None:
+                return dict(_BAD_URL_STATUS)
+            
+            api_url = _REPO_API_URL.format(owner=parsed[0], repo=parsed[1])
+            # 304 responses don't count against the rate limit
+            cached = self._etag_cache.get(api_url)
+            headers = {"If-None-Match": cached["etag"]} if cached else {}
+            
+            response = self._session.get(api_url, headers=headers, timeout=10)
             
-            api_url = f"https://api.github.com/repos/{owner}/{repo}"
-            response = requests.get(api_url, timeout=10)
+            # Back off once if GitHub reports we are rate limited
+            if response.status_code in (403, 429) and self._rate_limit_wait(response):
+                response = self._session.get(api_url, headers=headers, timeout=10)
             
-            if response.status_code == 200:
-                data = response.json()
-                return {
+            if response.status_code == 304 and cached:
+                return dict(cached["status"])
+            elif response.status_code == 200:
+                data = _json_loads(response.content)
+                status = {
                     "status": "active",
                     "last_updated": data.get("updated_at"),
                     "created_at": data.get("created_at"),
@@ -86,6 +326,9 @@ class EnhancedGitHubScanner:
                     "language": data.get("language"),
                     "open_issues": data.get("open_issues_count")
                 }
+                if response.headers.get("ETag"):
+                    self._etag_cache[api_url] = {"etag": response.headers["ETag"], "status": status}
+                return dict(status)
             elif response.status_code == 404:
                 return {"status": "removed", "error": "Repository not found"}
             else:
@@ -94,39 +337,126 @@ class EnhancedGitHubScanner:
         except Exception as e:
             return {"status": "error", "error": str(e)}
 
-    def calculate_freshness(self, updated_at: str) -> Dict:
-        """Calculate how fresh/recent a repository is"""
+    def batch_check_repos(self, repo_urls: List[str]) -> Optional[Dict[str, Dict]]:
+        """Check many repositories in a single GraphQL request.
+        
+        Returns a dict of url -> status (same shape as check_repo_status), or
+        None if the batch query could not be made (GraphQL requires a token).
+        """
+        if "Authorization" not in self._session.headers:
+            return None
+        
+        # One aliased repository() field per repo, owners/names passed as variables
+        fields = []
+        params = []
+        variables = {}
+        results = {}
+        aliases = {}
+        for i, repo_url in enumerate(repo_urls):
+            parsed = _parse_repo_url(repo_url)
+            if parsed is None:
+                results[repo_url] = dict(_BAD_URL_STATUS)
+                continue
+            
+            aliases[f"r{i}"] = repo_url
+            variables[f"o{i}"], variables[f"n{i}"] = parsed
+            params.append(f"$o{i}: String!, $n{i}: String!")
+            fields.append(
+                f"r{i}: repository(owner: $o{i}, name: $n{i}) {{ "
+                "updatedAt createdAt stargazerCount forkCount diskUsage "
+                "defaultBranchRef { name } primaryLanguage { name } "
+                "issues(states: OPEN) { totalCount } }"
+            )
+        if not aliases:
+            return results
+        query = f"query({', '.join(params)}) {{ {' '.join(fields)} }}"
+        
+        try:
+            response = self._session.post(
+                "https://api.github.com/graphql",
+                json={"query": query, "variables": variables},
+                timeout=15
+            )
+            if response.status_code != 200:
+                return None
+            payload = _json_loads(response.content)
+        except Exception as e:
+            self._print(f"GraphQL batch failed: {e}")
+            return None
+        
+        # A request-level failure (rate limit, server error) has no data or no
+        # per-alias path; fall back to REST rather than marking every repo as errored
+        data = payload.get("data")
+        if not data:
+            return None
+        errors = {}
+        for error in payload.get("errors", []):
+            if not error.get("path"):
+                return None
+            errors[error["path"][0]] = error
+        
+        for alias, repo_url in aliases.items():
+            repo = data.get(alias)
+            if repo is not None:
+                results[repo_url] = {
+                    "status": "active",
+                    "last_updated": repo.get("updatedAt"),
+                    "created_at": repo.get("createdAt"),
+                    "stars": repo.get("stargazerCount"),
+                    "forks": repo.get("forkCount"),
+                    "size_kb": repo.get("diskUsage"),
+                    "default_branch": (repo.get("defaultBranchRef") or {}).get("name", "main"),
+                    "language": (repo.get("primaryLanguage") or {}).get("name"),
+                    "open_issues": (repo.get("issues") or {}).get("totalCount")
+                }
+            elif errors.get(alias, {}).get("type") == "NOT_FOUND":
+                results[repo_url] = {"status": "removed", "error": "Repository not found"}
+            else:
+                results[repo_url] = {"status": "error", "error": errors.get(alias, {}).get("message", "GraphQL error")}
+        
+        return results
+
+    def _rate_limit_wait(self, response) -> bool:
+        """Sleep until the rate limit resets, returns True if a retry is worthwhile"""
+        retry_after = response.headers.get('Retry-After')
+        if retry_after is not None:
+            # Retry-After is either delta-seconds or an HTTP-date
+            try:
+                delay = int(retry_after)
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                except (TypeError, ValueError):
+                    return False
+                if retry_at.tzinfo is None:
+                    retry_at = retry_at.replace(tzinfo=timezone.utc)
+                delay = int((retry_at - datetime.now(timezone.utc)).total_seconds())
+        elif response.headers.get('X-RateLimit-Remaining') == '0':
+            reset = int(response.headers.get('X-RateLimit-Reset', time.time()))
+            delay = reset - int(time.time())
+        else:
+            return False
+        
+        # Don't stall a scan for longer than a minute
+        if delay > 60:
+            return False
+        time.sleep(max(delay, 1))
+        return True
+
+    def calculate_freshness(self, updated_at: str, now: Optional[datetime] = None) -> Dict:
+        """Calculate how fresh/recent a repository is.
+        
+        Pass `now` (UTC) when scoring many repos so the clock is read once per scan.
+        """
         try:
-            updated = datetime.fromisoformat(updated_at.replace('Z', '+00:00'))
-            now = datetime.now(updated.tzinfo)
+            if not _ISO_Z_SUPPORTED:
+                updated_at = updated_at.replace('Z', '+00:00')
+            updated = datetime.fromisoformat(updated_at)
+            if now is None:
+                now = datetime.now(timezone.utc)
             delta = now - updated
             
-            if delta.days == 0:
-                freshness = "today"
-                badge = "🔥 Today"
-                color = "fresh-today"
-            elif delta.days == 1:
-                freshness = "yesterday"
-                badge = "🔥 Yesterday"
-                color = "fresh-today"
-            elif delta.days <= 7:
-                freshness = f"{delta.days} days ago"
-                badge = f"✅ {delta.days}d ago"
-                color = "fresh-week"
-            elif delta.days <= 30:
-                freshness = f"{delta.days} days ago"
-                badge = f"📅 {delta.days}d ago"
-                color = "fresh-month"
-            elif delta.days <= 90:
-                months = delta.days // 30
-                freshness = f"{months} month{'s' if months > 1 else ''} ago"
-                badge = f"📅 {months}mo ago"
-                color = "fresh-quarter"
-            else:
-                months = delta.days // 30
-                freshness = f"{months} months ago"
-                badge = f"⚠️ {months}mo ago"
-                color = "fresh-old"
+            freshness, badge, color = _badge_for_days(delta.days)
             
             return {
                 "freshness": freshness,
@@ -146,21 +476,24 @@ class EnhancedGitHubScanner:
         """Search GitHub for new Epstein-related repositories"""
         try:
             search_url = f"https://api.github.com/search/repositories?q={query.replace(' ', '+')}&sort=updated&order=desc&per_page={max_results}"
-            response = requests.get(search_url, timeout=10)
+            response = self._session.get(search_url, timeout=10, stream=True)
             
-            if response.status_code == 200:
-                data = response.json()
+            with response:
+                if response.status_code != 200:
+                    return []
+                
                 repos = []
                 
                 # Get list of known repo URLs
-                known_urls = [r['url'] for r in self.known_repos]
+                known_urls = {r['url'] for r in self.known_repos}
+                now = datetime.now(timezone.utc)
                 
-                for item in data.get('items', []):
+                for item in self._iter_search_items(response):
                     repo_url = item['html_url']
                     
                     # Only include if not already in known repos
                     if repo_url not in known_urls:
-                        freshness = self.calculate_freshness(item['updated_at'])
+                        freshness = self.calculate_freshness(item['updated_at'], now)
                         
                         repos.append({
                             "name": item['name'],
@@ -180,21 +513,40 @@ class EnhancedGitHubScanner:
                         })
                 
                 return repos
-            else:
-                return []
         except Exception as e:
-            print(f"Error searching: {e}")
+            self._print(f"Error searching: {e}")
             return []
 
+    def _iter_search_items(self, response):
+        """Yield search result items, streaming them with ijson when available"""
+        if ijson is None:
+            yield from _json_loads(response.content).get('items', [])
+            return
+        
+        # Decode gzip transparently so ijson reads plain JSON from the socket
+        response.raw.decode_content = True
+        yield from ijson.items(response.raw, 'items.item')
+
     def scan_all_repos(self) -> List[Dict]:
         """Scan all known repositories and return status"""
         results = []
         
-        print(f"🔍 Scanning {len(self.known_repos)} known repositories...\n")
+        self._print(f"🔍 Scanning {len(self.known_repos)} known repositories...\n")
+        
+        # Prefer one GraphQL round-trip; fall back to concurrent REST checks
+        statuses = self.batch_check_repos([repo['url'] for repo in self.known_repos])
+        if statuses is None:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {executor.submit(self.check_repo_status, repo['url']): repo for repo in self.known_repos}
+                statuses = {}
+                for future in as_completed(futures):
+                    statuses[futures[future]['url']] = future.result()
+            self.save_etag_cache()
         
+        now = datetime.now(timezone.utc)
         for repo in self.known_repos:
-            print(f"Checking: {repo['name']}...")
-            status = self.check_repo_status(repo['url'])
+            self._print(f"Checking: {repo['name']}...")
+            status = statuses[repo['url']]
             
             result = {
                 **repo,
@@ -205,7 +557,7 @@ class EnhancedGitHubScanner:
             
             # Calculate freshness if active
             if status['status'] == 'active' and 'last_updated' in status:
-                freshness = self.calculate_freshness(status['last_updated'])
+                freshness = self.calculate_freshness(status['last_updated'], now)
                 result['freshness'] = freshness
             
             results.append(result)
@@ -213,117 +565,130 @@ class EnhancedGitHubScanner:
             # Print status
             if status['status'] == 'active':
                 fresh_badge = result.get('freshness', {}).get('badge', 'Unknown')
-                print(f"  ✅ ACTIVE - {status.get('stars', 0)} ⭐ | Updated: {fresh_badge}")
+                self._print(f"  ✅ ACTIVE - {status.get('stars', 0)} ⭐ | Updated: {fresh_badge}")
             elif status['status'] == 'removed':
-                print(f"  ❌ REMOVED - Repository no longer accessible!")
+                self._print(f"  ❌ REMOVED - Repository no longer accessible!")
             else:
-                print(f"  ⚠️  ERROR - {status.get('error', 'Unknown error')}")
+                self._print(f"  ⚠️  ERROR - {status.get('error', 'Unknown error')}")
             
-            print()
-            time.sleep(1)  # Rate limiting
+            self._print()
         
         return results
 
-    def save_scan_results(self, results: List[Dict]):
-        """Save scan results to JSON"""
+    def count_results(self, results: List[Dict]) -> Dict[str, int]:
+        """Count active, removed and new repos in a single pass"""
+        active = removed = new = 0
+        for r in results:
+            status = r['status']
+            if status == 'active':
+                active += 1
+            elif status == 'removed':
+                removed += 1
+            if r.get('is_new', False):
+                new += 1
+        
+        return {"active_repos": active, "removed_repos": removed, "new_repos": new}
+
+    def save_scan_results(self, results: List[Dict]) -> Dict[str, int]:
+        """Save scan results to JSON, returning the repo counts"""
+        counts = self.count_results(results)
         data = {
             "scan_time": datetime.now().isoformat(),
             "total_repos": len(results),
-            "active_repos": sum(1 for r in results if r['status'] == 'active'),
-            "removed_repos": sum(1 for r in results if r['status'] == 'removed'),
-            "new_repos": sum(1 for r in results if r.get('is_new', False)),
+            **counts,
             "repositories": results
         }
         
-        with open(self.scan_results_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        _atomic_write(self.scan_results_file, _json_dumps_indented(data))
         
-        print(f"✅ Scan results saved to {self.scan_results_file}")
+        self._print(f"✅ Scan results saved to {self.scan_results_file}")
+        return counts
 
     def generate_html_repo_cards(self, results: List[Dict]) -> str:
         """Generate HTML for repository cards with freshness indicators"""
-        html_cards = []
+        # Only active repos are rendered, so drop the rest before sorting
+        active = [r for r in results if r['status'] == 'active']
+        active.sort(key=lambda x: (x.get('is_new', False), x.get('freshness', {}).get('days_old', 9999)), reverse=True)
         
-        for repo in sorted(results, key=lambda x: (x.get('is_new', False), x.get('freshness', {}).get('days_old', 9999)), reverse=True):
-            if repo['status'] != 'active':
-                continue
-            
+        html_cards = []
+        for repo in active:
             freshness_info = repo.get('freshness', {})
-            is_new = repo.get('is_new', False)
-            
-            # Determine website link
-            website_html = ""
-            if 'website' in repo:
-                website_html = f'<a href="{repo["website"]}" target="_blank" class="source-link secondary">Website →</a>'
-            
-            # Build the card
-            card_html = f"""
-                    <div class="source-card github-repo {freshness_info.get('color', '')}">
-                        <div class="source-header">
-                            <h4>📦 {repo['name']}</h4>
-                            <div class="source-badges">
-                                {"<span class='new-badge'>🆕 NEW</span>" if is_new else ""}
-                                <span class="freshness-badge {freshness_info.get('color', '')}">{freshness_info.get('badge', '❓')}</span>
-                                <span class="source-status active">✅ Active</span>
-                            </div>
-                        </div>
-                        <p class="source-description">{repo.get('description', 'No description')}</p>
-                        <div class="source-meta">
-                            <span>⭐ {repo.get('stars', 0)} stars</span>
-                            <span>📦 {repo.get('size_kb', 0)} KB</span>
-                            {f"<span>💻 {repo.get('language', 'N/A')}</span>" if repo.get('language') else ""}
-                        </div>
-                        <div class="source-links">
-                            <a href="{repo['url']}" target="_blank" class="source-link">GitHub Repo →</a>
-                            {website_html}
-                        </div>
-                    </div>
-"""
-            html_cards.append(card_html)
+            html_cards.append(_CARD_TEMPLATE.render(
+                repo=repo,
+                color=freshness_info.get('color', ''),
+                badge=freshness_info.get('badge', '❓'),
+                is_new=repo.get('is_new', False)
+            ))
         
         return "\n".join(html_cards)
 
     def update_html_file(self, all_repos: List[Dict]):
         """Update the HTML file with new repository data"""
         if not os.path.exists(self.html_file):
-            print(f"⚠️  HTML file not found: {self.html_file}")
+            self._print(f"⚠️  HTML file not found: {self.html_file}")
             return False
         
-        # Read existing HTML
-        with open(self.html_file, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        
         # Generate new repository cards HTML
         new_cards = self.generate_html_repo_cards(all_repos)
+        scan_time = datetime.now().strftime('%B %d, %Y at %I:%M %p')
         
-        # Find and replace the GitHub repositories section
-        # Look for the section between <!-- GitHub Repositories --> and <!-- Archive.org Mirrors -->
-        pattern = r'(<!-- GitHub Repositories -->.*?<div class="source-category">.*?<h3>📦 GitHub Repositories</h3>.*?<p class="category-description">.*?</p>)(.*?)(<!-- Archive\.org Mirrors -->)'
+        # Locate the cards block by its sentinels without decoding the whole file
+        with open(self.html_file, 'rb') as f:
+            html_bytes = f.read()
+        start = html_bytes.find(_CARDS_START)
+        end = html_bytes.find(_CARDS_END, start) if start != -1 else -1
+        if start != -1 and end != -1:
+            head = html_bytes[:start + len(_CARDS_START)]
+            tail = html_bytes[end:]
+        else:
+            head = tail = None
         
-        replacement = f'\\1\n{new_cards}\n\n                    \\3'
+        if head is None:
+            return self._update_html_legacy(html_bytes.decode('utf-8'), new_cards, scan_time)
         
-        updated_html = re.sub(pattern, replacement, html_content, flags=re.DOTALL)
+        # Only the head/tail are scanned for the timestamp; the old cards are dropped unread
+        timestamp = f'Last Updated: {scan_time} |'.encode('utf-8')
+        head = _TIMESTAMP_RE.sub(lambda m: timestamp, head)
+        tail = _TIMESTAMP_RE.sub(lambda m: timestamp, tail)
         
-        # Also update the last scanned timestamp
-        scan_time = datetime.now().strftime('%B %d, %Y at %I:%M %p')
-        updated_html = re.sub(
-            r'Last Updated: .*?\|',
-            f'Last Updated: {scan_time} |',
-            updated_html
-        )
+        _atomic_write(self.html_file, head, f'\n{new_cards}\n                    '.encode('utf-8'), tail)
+        
+        self._print(f"✅ HTML file updated: {self.html_file}")
+        return True
+
+    def _update_html_legacy(self, html_content: str, new_cards: str, scan_time: str) -> bool:
+        """Rewrite an HTML file that predates the card sentinels, adding them"""
+        start, end = _CARDS_START.decode(), _CARDS_END.decode()
+        found_section = False
         
-        # Write updated HTML
-        with open(self.html_file, 'w', encoding='utf-8') as f:
-            f.write(updated_html)
+        # Replace the GitHub repositories section and the last scanned timestamp
+        def replace(match):
+            nonlocal found_section
+            if match.group(1) is not None:
+                found_section = True
+                return f'{match.group(1)}\n{start}\n{new_cards}\n{end}\n\n                    {match.group(3)}'
+            return f'Last Updated: {scan_time} |'
         
-        print(f"✅ HTML file updated: {self.html_file}")
+        updated_html = _HTML_UPDATE_RE.sub(replace, html_content)
+        if not found_section:
+            self._print(f"⚠️  GitHub repositories section not found in {self.html_file}")
+            return False
+        
+        _atomic_write(self.html_file, updated_html.encode('utf-8'))
+        
+        self._print(f"✅ HTML file updated: {self.html_file}")
         return True
 
     def add_new_repo_to_known_list(self, new_repos: List[Dict]):
         """Add newly discovered repos to the known repos list"""
+        if not new_repos:
+            return
+        
         added = 0
+        known_urls = {r['url'] for r in self.known_repos}
         for repo in new_repos:
-            if repo['url'] not in [r['url'] for r in self.known_repos]:
+            if repo['url'] not in known_urls:
+                known_urls.add(repo['url'])
                 self.known_repos.append({
                     "url": repo['url'],
                     "name": repo['name'],
@@ -333,59 +698,70 @@ class EnhancedGitHubScanner:
                 added += 1
         
         if added > 0:
-            print(f"✅ Added {added} new repositories to tracking list")
+            self.save_known_repos()
+            self._print(f"✅ Added {added} new repositories to tracking list")
+
+    def run_full_scan(self, search_for_new: bool = True, output=None):
+        """Run complete scan: check known repos + search for new ones + update HTML
+        
+        Progress is written to `output` if given, otherwise to stdout.
+        """
+        self._out = output
+        try:
+            self._run_full_scan(search_for_new)
+        finally:
+            self._out = None
 
-    def run_full_scan(self, search_for_new: bool = True):
-        """Run complete scan: check known repos + search for new ones + update HTML"""
-        print("=" * 70)
-        print("🔍 EPSTEIN FILES - ENHANCED GITHUB SCANNER WITH AUTO-UPDATE")
-        print("=" * 70)
-        print()
+    def _run_full_scan(self, search_for_new: bool):
+        self._print("=" * 70)
+        self._print("🔍 EPSTEIN FILES - ENHANCED GITHUB SCANNER WITH AUTO-UPDATE")
+        self._print("=" * 70)
+        self._print()
         
         # Step 1: Scan known repositories
-        print("📋 Step 1: Scanning known repositories...")
+        self._print("📋 Step 1: Scanning known repositories...")
         known_results = self.scan_all_repos()
         
         # Step 2: Search for new repositories
         new_results = []
         if search_for_new:
-            print("\n" + "=" * 70)
-            print("🔎 Step 2: Searching for new repositories...")
+            self._print("\n" + "=" * 70)
+            self._print("🔎 Step 2: Searching for new repositories...")
             new_results = self.search_new_repos()
             
             if new_results:
-                print(f"\n✨ Found {len(new_results)} new repositories:")
+                self._print(f"\n✨ Found {len(new_results)} new repositories:")
                 for repo in new_results:
-                    print(f"  - {repo['full_name']} ({repo['stars']} ⭐) - {repo['freshness']['badge']}")
+                    self._print(f"  - {repo['full_name']} ({repo['stars']} ⭐) - {repo['freshness']['badge']}")
                 
                 # Add to known list
                 self.add_new_repo_to_known_list(new_results)
             else:
-                print("No new repositories found.")
+                self._print("No new repositories found.")
         
         # Combine all results
         all_results = known_results + new_results
         
         # Step 3: Save results
-        print("\n" + "=" * 70)
-        print("💾 Step 3: Saving scan results...")
-        self.save_scan_results(all_results)
+        self._print("\n" + "=" * 70)
+        self._print("💾 Step 3: Saving scan results...")
+        counts = self.save_scan_results(all_results)
         
         # Step 4: Update HTML
-        print("\n" + "=" * 70)
-        print("🌐 Step 4: Updating HTML tracker...")
+        self._print("\n" + "=" * 70)
+        self._print("🌐 Step 4: Updating HTML tracker...")
         success = self.update_html_file(all_results)
         
         # Summary
-        print("\n" + "=" * 70)
-        print("📊 SCAN SUMMARY")
-        print("=" * 70)
-        print(f"  Known Repos Scanned: {len(known_results)}")
-        print(f"  Active Repositories: {sum(1 for r in all_results if r['status'] == 'active')}")
-        print(f"  Removed Repositories: {sum(1 for r in all_results if r['status'] == 'removed')}")
-        print(f"  New Repos Found: {len(new_results)}")
-        print(f"  HTML Updated: {'✅ Yes' if success else '❌ Failed'}")
-        print("=" * 70)
+        self._print("\n" + "=" * 70)
+        self._print("📊 SCAN SUMMARY")
+        self._print("=" * 70)
+        self._print(f"  Known Repos Scanned: {len(known_results)}")
+        self._print(f"  Active Repositories: {counts['active_repos']}")
+        self._print(f"  Removed Repositories: {counts['removed_repos']}")
+        self._print(f"  New Repos Found: {len(new_results)}")
+        self._print(f"  HTML Updated: {'✅ Yes' if success else '❌ Failed'}")
+        self._print("=" * 70)
 
 
 def main():